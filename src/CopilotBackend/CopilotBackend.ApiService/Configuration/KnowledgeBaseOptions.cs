@@ -0,0 +1,11 @@
+﻿namespace CopilotBackend.ApiService.Configuration;
+
+public class KnowledgeBaseOptions
+{
+    public const string SectionName = "KnowledgeBase";
+    public string StorePath { get; set; } = "knowledge_base";
+    public string EmbeddingModel { get; set; } = "text-embedding-3-small";
+    public int TopK { get; set; } = 3;
+    public int EmbeddingTimeoutMs { get; set; } = 1000;
+    public int SearchTimeoutMs { get; set; } = 150;
+}
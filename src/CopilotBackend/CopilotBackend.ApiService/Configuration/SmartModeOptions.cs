@@ -0,0 +1,10 @@
+﻿namespace CopilotBackend.ApiService.Configuration;
+
+public class SmartModeOptions
+{
+    public const string SectionName = "SmartMode";
+    public int MinBufferLength { get; set; } = 20;
+    public int DetectorHistoryTurns { get; set; } = 6;
+    public int BufferUtterances { get; set; } = 3;
+    public int LongUtteranceWords { get; set; } = 16;
+}
@@ -0,0 +1,8 @@
+﻿namespace CopilotBackend.ApiService.Configuration;
+
+public class StreamingOptions
+{
+    public const string SectionName = "Streaming";
+    public int MaxChunkChars { get; set; } = 64;
+    public int MaxChunkDelayMs { get; set; } = 30;
+}
@@ -0,0 +1,11 @@
+﻿namespace CopilotBackend.ApiService.Configuration;
+
+public class SummarizationOptions
+{
+    public const string SectionName = "Summarization";
+    public string Model { get; set; } = "gpt-4o-mini";
+    public string SpillPath { get; set; } = "summarization_pending.jsonl";
+    public int WorkerCount { get; set; } = 2;
+    public int EmbeddingBatchSize { get; set; } = 128;
+    public int MaxAttempts { get; set; } = 3;
+}
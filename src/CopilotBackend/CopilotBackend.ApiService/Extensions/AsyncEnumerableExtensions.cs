@@ -0,0 +1,95 @@
+using System.Diagnostics;
+using System.Runtime.CompilerServices;
+using System.Text;
+
+namespace CopilotBackend.ApiService.Extensions;
+
+public static class AsyncEnumerableExtensions
+{
+    /// <summary>
+    /// Merges small stream deltas into larger chunks. The first delta is passed through immediately,
+    /// the rest are buffered until <paramref name="maxChars"/> is reached or <paramref name="maxDelay"/> elapses.
+    /// </summary>
+    public static async IAsyncEnumerable<string> CoalesceAsync(
+        this IAsyncEnumerable<string> source,
+        int maxChars,
+        TimeSpan maxDelay,
+        [EnumeratorCancellation] CancellationToken ct = default)
+    {
+        if (maxChars <= 1 || maxDelay <= TimeSpan.Zero)
+        {
+            await foreach (var chunk in source.WithCancellation(ct))
+            {
+                yield return chunk;
+            }
+            yield break;
+        }
+
+        var enumerator = source.GetAsyncEnumerator(ct);
+        var buffer = new StringBuilder();
+        var isFirst = true;
+        var bufferStarted = 0L;
+        Task<bool>? pending = null;
+
+        try
+        {
+            while (true)
+            {
+                pending ??= enumerator.MoveNextAsync().AsTask();
+
+                if (buffer.Length > 0 && !pending.IsCompleted)
+                {
+                    var remaining = maxDelay - Stopwatch.GetElapsedTime(bufferStarted);
+                    if (remaining > TimeSpan.Zero)
+                    {
+                        using var delayCts = CancellationTokenSource.CreateLinkedTokenSource(ct);
+                        var completed = await Task.WhenAny(pending, Task.Delay(remaining, delayCts.Token));
+                        delayCts.Cancel();
+
+                        if (completed == pending) continue;
+                    }
+
+                    yield return buffer.ToString();
+                    buffer.Clear();
+                    continue;
+                }
+
+                var hasNext = await pending;
+                pending = null;
+                if (!hasNext) break;
+
+                var current = enumerator.Current;
+                if (string.IsNullOrEmpty(current)) continue;
+
+                if (isFirst)
+                {
+                    isFirst = false;
+                    yield return current;
+                    continue;
+                }
+
+                if (buffer.Length == 0) bufferStarted = Stopwatch.GetTimestamp();
+                buffer.Append(current);
+
+                if (buffer.Length >= maxChars)
+                {
+                    yield return buffer.ToString();
+                    buffer.Clear();
+                }
+            }
+
+            if (buffer.Length > 0)
+            {
+                yield return buffer.ToString();
+            }
+        }
+        finally
+        {
+            if (pending != null)
+            {
+                try { await pending; } catch { }
+            }
+            await enumerator.DisposeAsync();
+        }
+    }
+}
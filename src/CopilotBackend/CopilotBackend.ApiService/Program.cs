@@ -46,6 +46,10 @@ public class Program
         // Configuration
         builder.Services.Configure<AiOptions>(builder.Configuration.GetSection(AiOptions.SectionName));
         builder.Services.Configure<LlmOptions>(builder.Configuration.GetSection(LlmOptions.SectionName));
+        builder.Services.Configure<StreamingOptions>(builder.Configuration.GetSection(StreamingOptions.SectionName));
+        builder.Services.Configure<KnowledgeBaseOptions>(builder.Configuration.GetSection(KnowledgeBaseOptions.SectionName));
+        builder.Services.Configure<SummarizationOptions>(builder.Configuration.GetSection(SummarizationOptions.SectionName));
+        builder.Services.Configure<SmartModeOptions>(builder.Configuration.GetSection(SmartModeOptions.SectionName));
 
         Log.Logger = new LoggerConfiguration()
             .MinimumLevel.Information()
@@ -65,9 +69,13 @@ public class Program
         // Domain Services
         builder.Services.AddSingleton<ConversationContextService>();
         builder.Services.AddSingleton<DeepgramAudioService>();
+        builder.Services.AddSingleton<SessionVectorStore>();
         builder.Services.AddSingleton<SummarizationFaissWorker>();
+        builder.Services.AddHostedService(sp => sp.GetRequiredService<SummarizationFaissWorker>());
 
         // AI Stack
+        builder.Services.AddSingleton<EmbeddingService>();
+        builder.Services.AddSingleton<QuestionPreFilter>();
         builder.Services.AddTransient<PromptManager>();
         builder.Services.AddTransient<AiOrchestrator>();
         builder.Services.AddTransient<ILlmProvider, OpenAiProvider>();
@@ -13,6 +13,8 @@ public static class RouteExtensions
 
         api.MapGet("", () => Results.Ok("healthy"));
 
+        api.MapGet("/summarization/stats", ([FromServices] SummarizationFaissWorker worker) => Results.Ok(worker.GetStats()));
+
         api.MapPost("/message", async (HttpContext ctx, [FromBody] MessageRequest req, [FromServices] AiOrchestrator orchestrator) =>
         {
             await HandleSseStream(ctx, orchestrator.StreamSmartActionAsync(
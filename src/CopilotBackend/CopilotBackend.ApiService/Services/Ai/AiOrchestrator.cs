@@ -1,4 +1,6 @@
 ﻿using CopilotBackend.ApiService.Abstractions;
+using CopilotBackend.ApiService.Configuration;
+using Microsoft.Extensions.Options;
 
 namespace CopilotBackend.ApiService.Services.Ai;
 
@@ -8,17 +10,26 @@ public class AiOrchestrator
     private readonly PromptManager _promptManager;
     private readonly DeepgramAudioService _audioService;
     private readonly ConversationContextService _contextService;
+    private readonly QuestionPreFilter _questionPreFilter;
+    private readonly ILogger<AiOrchestrator> _logger;
+    private readonly SmartModeOptions _smartModeOptions;
 
     public AiOrchestrator(
         IEnumerable<ILlmProvider> providers,
         PromptManager promptManager,
         DeepgramAudioService audioService,
-        ConversationContextService contextService)
+        ConversationContextService contextService,
+        QuestionPreFilter questionPreFilter,
+        ILogger<AiOrchestrator> logger,
+        IOptions<SmartModeOptions> smartModeOptions)
     {
         _providers = providers;
         _promptManager = promptManager;
         _audioService = audioService;
         _contextService = contextService;
+        _questionPreFilter = questionPreFilter;
+        _logger = logger;
+        _smartModeOptions = smartModeOptions.Value;
     }
 
     public async Task<string> ProcessRequestAsync(string connectionId, string modelName, string instruction, string? Image)
@@ -60,15 +71,21 @@ public class AiOrchestrator
         return await provider.GenerateResponseAsync(messages, version, Image);
     }
 
-    public async Task<string?> DetectQuestionAsync(string connectionId, string modelName, string transcript)
+    public async Task<string?> DetectQuestionAsync(string connectionId, string modelName, string transcript, string? latestUtterance = null)
     {
         if (string.IsNullOrWhiteSpace(transcript)) return null;
 
+        if (!_questionPreFilter.IsLikelyQuestion(latestUtterance ?? transcript))
+        {
+            _logger.LogDebug("[{ConnectionId}] Pre-filter skipped question detection.", connectionId);
+            return null;
+        }
+
         var name = modelName.Split(' ')[0];
         var provider = _providers.FirstOrDefault(p => p.ProviderName == name);
         if (provider == null) return null;
 
-        var historyText = _contextService.GetFormattedLog(connectionId, [SpeakerRole.Companion]);
+        var historyText = _contextService.GetFormattedLog(connectionId, [SpeakerRole.Companion], _smartModeOptions.DetectorHistoryTurns);
 
         var systemPrompt =
             "You are a conversation analyzer. Your goal is to identify if the User needs help right now.\n" +
@@ -0,0 +1,48 @@
+﻿using CopilotBackend.ApiService.Configuration;
+using CopilotBackend.ApiService.Services.Ai.Providers;
+using Microsoft.Extensions.Options;
+using System.Text.Json.Nodes;
+
+namespace CopilotBackend.ApiService.Services.Ai;
+
+public class EmbeddingService
+{
+    private readonly IOpenAiApi _openAiApi;
+    private readonly string _apiKey;
+    private readonly string _model;
+
+    public EmbeddingService(IOpenAiApi openAiApi, IOptions<AiOptions> aiOptions, IOptions<KnowledgeBaseOptions> kbOptions)
+    {
+        _openAiApi = openAiApi;
+        _apiKey = $"Bearer {aiOptions.Value.OpenAiApiKey}";
+        _model = kbOptions.Value.EmbeddingModel;
+    }
+
+    public async Task<List<float[]>> GetEmbeddingsAsync(IReadOnlyList<string> texts, CancellationToken ct = default)
+    {
+        var result = new List<float[]>();
+        if (texts.Count == 0) return result;
+
+        var request = new JsonObject
+        {
+            ["model"] = _model,
+            ["input"] = new JsonArray(texts.Select(t => (JsonNode)t).ToArray())
+        };
+
+        var response = await _openAiApi.GetEmbeddingsAsync(request, _apiKey, ct);
+        var dataArray = response["data"]?.AsArray();
+
+        if (dataArray == null) return result;
+
+        foreach (var item in dataArray)
+        {
+            var embedding = item?["embedding"]?.AsArray().Select(v => (float)v!.GetValue<double>()).ToArray();
+            if (embedding != null)
+            {
+                result.Add(embedding);
+            }
+        }
+
+        return result;
+    }
+}
@@ -1,4 +1,6 @@
 ﻿using CopilotBackend.ApiService.Abstractions;
+using CopilotBackend.ApiService.Configuration;
+using Microsoft.Extensions.Options;
 using System.Text;
 
 namespace CopilotBackend.ApiService.Services.Ai;
@@ -6,6 +8,12 @@ namespace CopilotBackend.ApiService.Services.Ai;
 public class PromptManager
 {
     private readonly ConversationContextService _contextService;
+    private readonly EmbeddingService _embeddingService;
+    private readonly SessionVectorStore _vectorStore;
+    private readonly ILogger<PromptManager> _logger;
+    private readonly int _knowledgeTopK;
+    private readonly TimeSpan _embeddingTimeout;
+    private readonly TimeSpan _searchTimeout;
     private readonly string _promptsFolder;
     private readonly string _userContextFile = "user.md";
     private readonly string _systemPromptFile = "system.md";
@@ -13,9 +21,21 @@ public class PromptManager
     private readonly string _followupPromptFile = "followup.md";
     private readonly string _continuePromptFile = "continue.md";
 
-    public PromptManager(ConversationContextService contextService, IWebHostEnvironment env)
+    public PromptManager(
+        ConversationContextService contextService,
+        EmbeddingService embeddingService,
+        SessionVectorStore vectorStore,
+        ILogger<PromptManager> logger,
+        IOptions<KnowledgeBaseOptions> kbOptions,
+        IWebHostEnvironment env)
     {
         _contextService = contextService;
+        _embeddingService = embeddingService;
+        _vectorStore = vectorStore;
+        _logger = logger;
+        _knowledgeTopK = kbOptions.Value.TopK;
+        _embeddingTimeout = TimeSpan.FromMilliseconds(kbOptions.Value.EmbeddingTimeoutMs);
+        _searchTimeout = TimeSpan.FromMilliseconds(kbOptions.Value.SearchTimeoutMs);
         _promptsFolder = Path.Combine(env.ContentRootPath, "promts");
     }
 
@@ -109,6 +129,8 @@ public class PromptManager
 
     public async Task<List<ChatMessage>> BuildRequestMessagesAsync(string connectionId, string userInstruction, bool ifImage = false)
     {
+        // Runs alongside prompt loading; bounded by the embedding and search timeouts.
+        var knowledgeTask = LoadKnowledgeContextAsync(userInstruction);
         var systemPrompt = await LoadPromptAsync(_systemPromptFile);
         var userPersona = await LoadPromptAsync(_userContextFile);
         var dialogueHistory = _contextService.GetFormattedLog(connectionId, [SpeakerRole.Me, SpeakerRole.Companion]);
@@ -128,6 +150,8 @@ public class PromptManager
             userBuilder.AppendLine("\n### PREVIOUS AI ANALYSIS (CONTEXT ONLY)").AppendLine(aiResponses);
         }
 
+        userBuilder.Append(await knowledgeTask);
+
         userBuilder.AppendLine("\n### FINAL INSTRUCTION").AppendLine(userInstruction);
 
         return new List<ChatMessage>
@@ -151,6 +175,49 @@ public class PromptManager
           .AppendLine("5. Output ONLY the source code.");
     }
 
+    private async Task<string> LoadKnowledgeContextAsync(string query)
+    {
+        if (_knowledgeTopK <= 0 || string.IsNullOrWhiteSpace(query) || _vectorStore.Count == 0) return string.Empty;
+
+        IReadOnlyList<VectorSearchResult> blocks;
+        var stage = "embedding";
+        var budget = _embeddingTimeout;
+        try
+        {
+            List<float[]> embeddings;
+            using (var embeddingCts = new CancellationTokenSource(_embeddingTimeout))
+            {
+                embeddings = await _embeddingService.GetEmbeddingsAsync([query], embeddingCts.Token);
+            }
+            if (embeddings.Count == 0) return string.Empty;
+
+            // The scan gets its own budget so a slow embedding call cannot eat into it.
+            // Task.Run moves the synchronous scan off the request thread so prompt files load in parallel.
+            (stage, budget) = ("search", _searchTimeout);
+            using var searchCts = new CancellationTokenSource(_searchTimeout);
+            blocks = await Task.Run(() => _vectorStore.Search(embeddings[0], _knowledgeTopK, searchCts.Token), searchCts.Token);
+        }
+        catch (OperationCanceledException)
+        {
+            _logger.LogWarning("Knowledge base {Stage} exceeded {Timeout} ms, continuing without past sessions.", stage, budget.TotalMilliseconds);
+            return string.Empty;
+        }
+        catch (Exception ex)
+        {
+            _logger.LogWarning(ex, "Knowledge base lookup failed, continuing without past sessions.");
+            return string.Empty;
+        }
+
+        if (blocks.Count == 0) return string.Empty;
+
+        var sb = new StringBuilder().AppendLine("\n### RELEVANT PAST SESSIONS (CONTEXT ONLY)");
+        foreach (var block in blocks)
+        {
+            sb.AppendLine($"- {block.Text}");
+        }
+        return sb.ToString();
+    }
+
     private async Task<string> LoadPromptAsync(string fileName)
     {
         var path = Path.Combine(_promptsFolder, fileName);
@@ -12,5 +12,5 @@ public interface IOpenAiApi
     Task<HttpResponseMessage> ChatStreamAsync([Body] JsonObject request, [Header("Authorization")] string authorization);
 
     [Post("/embeddings")]
-    Task<JsonObject> GetEmbeddingsAsync([Body] JsonObject request, [Header("Authorization")] string authorization);
+    Task<JsonObject> GetEmbeddingsAsync([Body] JsonObject request, [Header("Authorization")] string authorization, CancellationToken ct = default);
 }
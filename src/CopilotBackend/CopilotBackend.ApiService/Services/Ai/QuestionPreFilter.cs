@@ -0,0 +1,107 @@
+﻿using CopilotBackend.ApiService.Configuration;
+using Microsoft.Extensions.Options;
+using System.Text.RegularExpressions;
+
+namespace CopilotBackend.ApiService.Services.Ai;
+
+/// <summary>
+/// Cheap local check that runs before the LLM question detector.
+/// Rejects utterances with no question mark, interrogative or imperative opener, or explicit request phrase.
+/// Long utterances always go to the LLM, since a question buried in a monologue is easy to miss with word lists.
+/// Word lists are tuned on the "tune" split of CopilotBackend.Benchmarks/Data/smart_mode_transcripts.jsonl
+/// and scored on the "holdout" split.
+/// </summary>
+public class QuestionPreFilter
+{
+    private static readonly HashSet<string> Interrogatives = new(StringComparer.OrdinalIgnoreCase)
+    {
+        // en
+        "what", "why", "how", "when", "where", "who", "whom", "whose", "which", "any",
+        "can", "could", "would", "will", "should", "shall", "do", "does", "did",
+        "is", "are", "was", "were", "have", "has", "may", "might",
+        // ru
+        "что", "почему", "зачем", "как", "когда", "где", "куда", "откуда", "кто", "чем", "чего",
+        "какой", "какая", "какое", "какие", "каким", "какую", "сколько", "чей", "чья", "чьё",
+        "можете", "можешь", "могли", "мог", "могла"
+    };
+
+    private static readonly HashSet<string> Directives = new(StringComparer.OrdinalIgnoreCase)
+    {
+        // en
+        "tell", "explain", "describe", "walk", "talk", "give", "show", "name", "list",
+        "compare", "find", "write", "implement", "design", "estimate", "calculate", "solve",
+        "elaborate", "discuss", "clarify", "share", "suppose", "imagine", "assume",
+        // ru
+        "расскажите", "расскажи", "объясните", "объясни", "опишите", "опиши", "приведите", "покажите",
+        "назовите", "сравните", "найдите", "напишите", "реализуйте", "поделитесь", "оцените",
+        "обсудим", "поговорим", "разберём", "разберем", "уточните", "предположим", "допустим", "представьте"
+    };
+
+    // Skipped before the opener is read, so "please explain" and "let's discuss" resolve to their verb
+    // while "let's start" or "please hold on" do not.
+    private static readonly HashSet<string> Fillers = new(StringComparer.OrdinalIgnoreCase)
+    {
+        "and", "so", "but", "well", "then", "also", "okay", "ok", "now", "please", "let's", "let’s",
+        "а", "и", "но", "ну", "так", "тогда", "ладно", "теперь", "пожалуйста", "давайте", "давай"
+    };
+
+    private static readonly string[] RequestPhrases =
+    {
+        "tell me", "tell us", "walk me through", "walk us through", "give me an example", "what about",
+        "i'd like to hear", "i would like to hear", "i'm curious", "i am curious", "i was wondering", "i wonder",
+        "i'd love to know", "i would love to know", "i'd love to hear", "i would love to hear", "i want to know",
+        "мне интересно", "хотелось бы узнать", "хотелось бы услышать", "хочу услышать", "нужно найти", "нужно написать", "нужно реализовать", "а если"
+    };
+
+    private static readonly HashSet<string> Acknowledgements = new(StringComparer.OrdinalIgnoreCase)
+    {
+        "ok", "okay", "right", "yes", "yeah", "yep", "sure", "got it", "i see", "mhm", "uh-huh", "cool", "great",
+        "ок", "окей", "да", "ага", "понятно", "ясно", "хорошо", "угу", "отлично"
+    };
+
+    private static readonly Regex SentenceSplit = new(@"(?<=[.!?…])\s+", RegexOptions.Compiled);
+    private static readonly Regex Word = new(@"\p{L}[\p{L}'’-]*", RegexOptions.Compiled);
+
+    private readonly int _longUtteranceWords;
+
+    public QuestionPreFilter(IOptions<SmartModeOptions> options)
+    {
+        _longUtteranceWords = options.Value.LongUtteranceWords;
+    }
+
+    public bool IsLikelyQuestion(string transcript)
+    {
+        if (string.IsNullOrWhiteSpace(transcript)) return false;
+        if (_longUtteranceWords > 0 && Word.Count(transcript) >= _longUtteranceWords) return true;
+
+        foreach (var raw in SentenceSplit.Split(transcript.Trim()))
+        {
+            var sentence = raw.Trim();
+            if (sentence.Length == 0) continue;
+
+            var normalized = sentence.TrimEnd('.', '!', '?', '…', ',').Trim();
+            if (Acknowledgements.Contains(normalized)) continue;
+
+            if (sentence.EndsWith('?')) return true;
+
+            var words = Word.Matches(sentence).Select(m => m.Value).SkipWhile(Fillers.Contains).ToList();
+            if (words.Count < 2) continue;
+
+            // "What's" / "How's" count as their interrogative.
+            var opener = words[0].Split('\'', '’')[0];
+
+            // "Do not worry..." is a negative imperative, not a "Do you..." question.
+            if (opener.Equals("do", StringComparison.OrdinalIgnoreCase) && words[1].Equals("not", StringComparison.OrdinalIgnoreCase))
+                continue;
+
+            // Russian yes/no questions put "ли" right after the first word.
+            if (Interrogatives.Contains(opener) || Directives.Contains(opener) || words[1].Equals("ли", StringComparison.OrdinalIgnoreCase))
+                return true;
+
+            if (RequestPhrases.Any(p => sentence.Contains(p, StringComparison.OrdinalIgnoreCase)))
+                return true;
+        }
+
+        return false;
+    }
+}
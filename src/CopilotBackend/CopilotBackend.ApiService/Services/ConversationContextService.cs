@@ -88,14 +88,17 @@ public class ConversationContextService
         return new List<ConversationMessage>();
     }
 
-    public string GetFormattedLog(string connectionId, SpeakerRole[] requiredRoles)
+    public string GetFormattedLog(string connectionId, SpeakerRole[] requiredRoles, int maxMessages = 0)
     {
         if (!_sessions.TryGetValue(connectionId, out var session)) return "";
 
         lock (session.LockObj)
         {
             var sb = new StringBuilder();
-            foreach (var msg in session.History.OrderBy(r => r.Timestamp).Where(r => requiredRoles.Contains(r.Role)))
+            var messages = session.History.OrderBy(r => r.Timestamp).Where(r => requiredRoles.Contains(r.Role));
+            if (maxMessages > 0) messages = messages.TakeLast(maxMessages);
+
+            foreach (var msg in messages)
             {
                 sb.AppendLine($"**{msg.Role}**: {msg.Text}");
                 sb.AppendLine();
@@ -1,5 +1,8 @@
-﻿using CopilotBackend.ApiService.Services.Ai;
+﻿using CopilotBackend.ApiService.Configuration;
+using CopilotBackend.ApiService.Extensions;
+using CopilotBackend.ApiService.Services.Ai;
 using Microsoft.AspNetCore.SignalR;
+using Microsoft.Extensions.Options;
 using System.Collections.Concurrent;
 using System.Runtime.CompilerServices;
 using System.Text;
@@ -13,11 +16,16 @@ public class SmartHub : Hub
     private readonly ConversationContextService _contextService;
     private readonly SummarizationFaissWorker _faissWorker;
     private readonly ILogger<SmartHub> _logger;
+    private readonly StreamingOptions _streamingOptions;
+    private readonly SmartModeOptions _smartModeOptions;
 
     private static readonly ConcurrentDictionary<string, string> _latestScreenshots = new();
+    private static readonly ConcurrentDictionary<string, StreamingOptions> _streamingSettings = new();
 
-    public SmartHub(AiOrchestrator orchestrator, DeepgramAudioService audioService, ILogger<SmartHub> logger, ConversationContextService conversationContext, SummarizationFaissWorker faissWorker)
+    public SmartHub(AiOrchestrator orchestrator, DeepgramAudioService audioService, ILogger<SmartHub> logger, ConversationContextService conversationContext, SummarizationFaissWorker faissWorker, IOptions<StreamingOptions> streamingOptions, IOptions<SmartModeOptions> smartModeOptions)
     {
+        _streamingOptions = streamingOptions.Value;
+        _smartModeOptions = smartModeOptions.Value;
         _orchestrator = orchestrator;
         _audioService = audioService;
         _logger = logger;
@@ -47,19 +55,26 @@ public class SmartHub : Hub
         var historyToProcess = _contextService.GetFullHistoryAndClear(connectionId);
         if (historyToProcess.Any())
         {
-            _ = Task.Run(() => _faissWorker.ProcessSessionAsync(connectionId, historyToProcess));
+            _faissWorker.Enqueue(connectionId, historyToProcess);
         }
     }
 
     public void UpdateVisualContext(string base64Image) => _latestScreenshots[Context.ConnectionId] = base64Image;
 
+    public void ConfigureStreaming(int maxChunkChars, int maxChunkDelayMs) =>
+        _streamingSettings[Context.ConnectionId] = new StreamingOptions
+        {
+            MaxChunkChars = Math.Max(1, maxChunkChars),
+            MaxChunkDelayMs = Math.Max(0, maxChunkDelayMs)
+        };
+
     public async IAsyncEnumerable<string> SendMessage(string text, string model, string? image, [EnumeratorCancellation] CancellationToken ct)
     {
         var connectionId = Context.ConnectionId;
         var chunks = _orchestrator.StreamSmartActionAsync(AiOrchestrator.AiActionType.System, model, connectionId, image, text);
         var aiResponseBuffer = new StringBuilder();
 
-        await foreach (var chunk in chunks.WithCancellation(ct))
+        await foreach (var chunk in Coalesce(chunks, ct))
         {
             aiResponseBuffer.Append(chunk);
             yield return chunk;
@@ -74,7 +89,7 @@ public class SmartHub : Hub
         var chunks = _orchestrator.StreamSmartActionAsync(AiOrchestrator.AiActionType.Continue, model, connectionId, image);
         var aiResponseBuffer = new StringBuilder();
 
-        await foreach (var chunk in chunks.WithCancellation(ct))
+        await foreach (var chunk in Coalesce(chunks, ct))
         {
             aiResponseBuffer.Append(chunk);
             yield return chunk;
@@ -89,7 +104,7 @@ public class SmartHub : Hub
         var chunks = _orchestrator.StreamSmartActionAsync(AiOrchestrator.AiActionType.Assist, model, connectionId, image);
         var aiResponseBuffer = new StringBuilder();
 
-        await foreach (var chunk in chunks.WithCancellation(ct))
+        await foreach (var chunk in Coalesce(chunks, ct))
         {
             aiResponseBuffer.Append(chunk);
             yield return chunk;
@@ -104,7 +119,7 @@ public class SmartHub : Hub
         var chunks = _orchestrator.StreamSmartActionAsync(AiOrchestrator.AiActionType.Followup, model, connectionId, image);
         var aiResponseBuffer = new StringBuilder();
 
-        await foreach (var chunk in chunks.WithCancellation(ct))
+        await foreach (var chunk in Coalesce(chunks, ct))
         {
             aiResponseBuffer.Append(chunk);
             yield return chunk;
@@ -117,22 +132,39 @@ public class SmartHub : Hub
     {
         var connectionId = Context.ConnectionId;
         _logger.LogInformation($"[SmartHub] Smart Mode started: {Context.ConnectionId}");
-        var buffer = new StringBuilder();
+        var recentUtterances = new Queue<string>();
+        var utterance = new StringBuilder();
 
         while (!ct.IsCancellationRequested)
         {
             var newText = _audioService.PopNewText();
-            if (!string.IsNullOrWhiteSpace(newText)) buffer.Append(" ").Append(newText);
+            var hasNewText = !string.IsNullOrWhiteSpace(newText);
+            if (hasNewText)
+            {
+                utterance.Append(" ").Append(newText);
+            }
 
-            if (buffer.Length > 20)
+            // Only run detection once per utterance: after new text arrived and the speaker paused.
+            if (utterance.Length > 0 && !hasNewText)
             {
-                var detectedIssue = await _orchestrator.DetectQuestionAsync(connectionId, modelName, buffer.ToString());
+                var latestUtterance = utterance.ToString().Trim();
+                utterance.Clear();
+
+                // The detector only sees the last few utterances, so its prompt stays bounded for the whole session.
+                recentUtterances.Enqueue(latestUtterance);
+                while (recentUtterances.Count > Math.Max(1, _smartModeOptions.BufferUtterances)) recentUtterances.Dequeue();
+
+                var buffer = string.Join(" ", recentUtterances);
+                var detectedIssue = buffer.Length > _smartModeOptions.MinBufferLength
+                    ? await _orchestrator.DetectQuestionAsync(connectionId, modelName, buffer, latestUtterance)
+                    : null;
+
                 if (detectedIssue != null)
                 {
                     var aiResponseBuffer = new StringBuilder();
                     yield return $"[System] Intent: {detectedIssue}";
                     _latestScreenshots.TryGetValue(Context.ConnectionId, out var img);
-                    await foreach (var chunk in _orchestrator.StreamSmartActionAsync(AiOrchestrator.AiActionType.System, modelName, connectionId, img, detectedIssue).WithCancellation(ct))
+                    await foreach (var chunk in Coalesce(_orchestrator.StreamSmartActionAsync(AiOrchestrator.AiActionType.System, modelName, connectionId, img, detectedIssue), ct))
                     {
                         yield return chunk;
                         aiResponseBuffer.Append(chunk);
@@ -140,7 +172,7 @@ public class SmartHub : Hub
 
                     _contextService.AddAiResponse(Context.ConnectionId, aiResponseBuffer.ToString());
                     aiResponseBuffer.Clear();
-                    buffer.Clear();
+                    recentUtterances.Clear();
                 }
             }
             await Task.Delay(500, ct);
@@ -150,6 +182,13 @@ public class SmartHub : Hub
     public override Task OnDisconnectedAsync(Exception? exception)
     {
         _latestScreenshots.TryRemove(Context.ConnectionId, out _);
+        _streamingSettings.TryRemove(Context.ConnectionId, out _);
         return base.OnDisconnectedAsync(exception);
     }
+
+    private IAsyncEnumerable<string> Coalesce(IAsyncEnumerable<string> chunks, CancellationToken ct)
+    {
+        var settings = _streamingSettings.GetValueOrDefault(Context.ConnectionId, _streamingOptions);
+        return chunks.CoalesceAsync(settings.MaxChunkChars, TimeSpan.FromMilliseconds(settings.MaxChunkDelayMs), ct);
+    }
 }
\ No newline at end of file
@@ -0,0 +1,429 @@
+﻿using CopilotBackend.ApiService.Configuration;
+using Microsoft.Extensions.Options;
+using System.Diagnostics;
+using System.IO.MemoryMappedFiles;
+using System.Numerics;
+using System.Runtime.InteropServices;
+using System.Text.Json;
+
+namespace CopilotBackend.ApiService.Services;
+
+public class VectorRecord
+{
+    public string SessionId { get; set; } = string.Empty;
+    public string Text { get; set; } = string.Empty;
+    public float[] Embedding { get; set; } = Array.Empty<float>();
+}
+
+public class VectorMetadata
+{
+    public string SessionId { get; set; } = string.Empty;
+    public string Text { get; set; } = string.Empty;
+    public DateTime Timestamp { get; set; }
+}
+
+public record VectorSearchResult(string SessionId, string Text, float Distance);
+
+/// <summary>
+/// Append-only knowledge base. Vectors live in a raw float32 file (int32 dimension header followed by
+/// fixed-size rows) that is memory-mapped for search; metadata is a JSON-lines log with one row per vector.
+/// Each embedding model gets its own pair of files, since vectors from different models are not comparable.
+/// </summary>
+public class SessionVectorStore : IDisposable
+{
+    private const int HeaderSize = sizeof(int);
+    private const int MinRowsPerPartition = 8192;
+    private const int CancellationCheckRows = 4096;
+    private const string LegacyKnowledgeBasePath = "knowledge_base.json";
+    private const string LegacyEmbeddingModel = "text-embedding-3-small";
+
+    // Max-heap on distance so the worst of the current top-k is always at the head.
+    private static readonly Comparer<float> WorstFirst = Comparer<float>.Create((a, b) => b.CompareTo(a));
+
+    private readonly ILogger<SessionVectorStore> _logger;
+    private readonly string _embeddingModel;
+    private readonly string _vectorsPath;
+    private readonly string _metadataPath;
+    private readonly List<VectorMetadata> _metadata = new();
+    private readonly ReaderWriterLockSlim _lock = new();
+
+    private int _dimension;
+    private MemoryMappedFile? _map;
+    private int _mappedCount;
+
+    public SessionVectorStore(ILogger<SessionVectorStore> logger, IOptions<KnowledgeBaseOptions> options)
+    {
+        _logger = logger;
+        _embeddingModel = options.Value.EmbeddingModel;
+
+        var storePath = $"{options.Value.StorePath}.{ToFileName(_embeddingModel)}";
+        _vectorsPath = $"{storePath}.vec";
+        _metadataPath = $"{storePath}.meta.jsonl";
+
+        AdoptUnversionedStore(options.Value.StorePath);
+        Load();
+        MigrateLegacyStore();
+    }
+
+    public int Count
+    {
+        get
+        {
+            _lock.EnterReadLock();
+            try { return _metadata.Count; }
+            finally { _lock.ExitReadLock(); }
+        }
+    }
+
+    public void Append(string sessionId, IReadOnlyList<string> texts, IReadOnlyList<float[]> embeddings)
+    {
+        if (texts.Count != embeddings.Count)
+            throw new ArgumentException("Each text block must have exactly one embedding.");
+        if (texts.Count == 0) return;
+
+        _lock.EnterWriteLock();
+        try
+        {
+            var dimension = _metadata.Count == 0 ? embeddings[0].Length : _dimension;
+            if (embeddings.Any(e => e.Length != dimension))
+            {
+                _logger.LogError("Embedding dimension mismatch for {Path}: store holds {Expected}-dimensional vectors of {Model}, got {Actual}.", _vectorsPath, dimension, _embeddingModel, embeddings.First(e => e.Length != dimension).Length);
+                throw new InvalidOperationException($"Embedding dimension mismatch. Store expects {dimension}.");
+            }
+
+            ReleaseMap();
+
+            var now = DateTime.UtcNow;
+            var lines = texts.Select(t => new VectorMetadata { SessionId = sessionId, Text = t, Timestamp = now }).ToList();
+
+            // Rows are written at the offset implied by the committed metadata, never at the physical end,
+            // so a partial tail from an earlier failure is overwritten instead of shifting every later row.
+            var committedLength = _metadata.Count == 0 ? 0 : HeaderSize + (long)_metadata.Count * dimension * sizeof(float);
+
+            using var vectors = new FileStream(_vectorsPath, FileMode.OpenOrCreate, FileAccess.Write, FileShare.Read);
+            try
+            {
+                if (committedLength == 0)
+                {
+                    vectors.SetLength(0);
+                    vectors.Write(BitConverter.GetBytes(dimension));
+                }
+                else
+                {
+                    vectors.Seek(committedLength, SeekOrigin.Begin);
+                }
+
+                foreach (var embedding in embeddings)
+                {
+                    vectors.Write(MemoryMarshal.AsBytes(embedding.AsSpan()));
+                }
+                vectors.SetLength(vectors.Position);
+                vectors.Flush(true);
+
+                File.AppendAllLines(_metadataPath, lines.Select(m => JsonSerializer.Serialize(m)));
+            }
+            catch
+            {
+                RollBack(vectors, committedLength);
+                throw;
+            }
+
+            _dimension = dimension;
+            _metadata.AddRange(lines);
+        }
+        finally
+        {
+            _lock.ExitWriteLock();
+        }
+
+        _logger.LogInformation("Appended {Count} vectors for session {SessionId}. Total vectors in base: {Total}", texts.Count, sessionId, Count);
+    }
+
+    public IReadOnlyList<VectorSearchResult> Search(float[] query, int topK, CancellationToken ct = default)
+    {
+        if (topK <= 0) return Array.Empty<VectorSearchResult>();
+
+        var started = Stopwatch.GetTimestamp();
+        _lock.EnterUpgradeableReadLock();
+        try
+        {
+            var count = _metadata.Count;
+            if (count == 0) return Array.Empty<VectorSearchResult>();
+            if (query.Length != _dimension)
+            {
+                _logger.LogError("Query embedding has dimension {Actual} but {Path} holds {Expected}-dimensional vectors of {Model}.", query.Length, _vectorsPath, _dimension, _embeddingModel);
+                return Array.Empty<VectorSearchResult>();
+            }
+
+            if (_map == null || _mappedCount != count)
+            {
+                _lock.EnterWriteLock();
+                try
+                {
+                    ReleaseMap();
+                    var stream = new FileStream(_vectorsPath, FileMode.Open, FileAccess.Read, FileShare.ReadWrite);
+                    _map = MemoryMappedFile.CreateFromFile(stream, null, 0, MemoryMappedFileAccess.Read, HandleInheritability.None, false);
+                    _mappedCount = count;
+                }
+                finally
+                {
+                    _lock.ExitWriteLock();
+                }
+            }
+
+            // Downgrade so concurrent searches can scan in parallel; appends still wait for the scan.
+            _lock.EnterReadLock();
+            _lock.ExitUpgradeableReadLock();
+            try
+            {
+                var heap = new PriorityQueue<int, float>(topK + 1, WorstFirst);
+
+                using (var accessor = _map.CreateViewAccessor(HeaderSize, (long)count * _dimension * sizeof(float), MemoryMappedFileAccess.Read))
+                {
+                    ScanVectors(accessor, count, query, heap, topK, ct);
+                }
+
+                var results = new List<VectorSearchResult>(heap.Count);
+                while (heap.TryDequeue(out var row, out var distance))
+                {
+                    results.Add(new VectorSearchResult(_metadata[row].SessionId, _metadata[row].Text, distance));
+                }
+                results.Reverse();
+
+                _logger.LogDebug("Scanned {Count} vectors in {Elapsed} ms", count, Stopwatch.GetElapsedTime(started).TotalMilliseconds);
+                return results;
+            }
+            finally
+            {
+                _lock.ExitReadLock();
+            }
+        }
+        finally
+        {
+            if (_lock.IsUpgradeableReadLockHeld) _lock.ExitUpgradeableReadLock();
+        }
+    }
+
+    private unsafe void ScanVectors(MemoryMappedViewAccessor accessor, int count, float[] query, PriorityQueue<int, float> heap, int topK, CancellationToken ct)
+    {
+        byte* ptr = null;
+        var handle = accessor.SafeMemoryMappedViewHandle;
+        handle.AcquirePointer(ref ptr);
+        try
+        {
+            var rowsAddress = (nint)(ptr + accessor.PointerOffset);
+            var dimension = _dimension;
+
+            // The scan is memory-bound, so split the rows into contiguous ranges and keep a top-k per range.
+            var partitions = Math.Clamp(count / MinRowsPerPartition, 1, Environment.ProcessorCount);
+            var partitionSize = (count + partitions - 1) / partitions;
+            var partial = new PriorityQueue<int, float>[partitions];
+
+            Parallel.For(0, partitions, new ParallelOptions { CancellationToken = ct }, p =>
+            {
+                var rows = (float*)rowsAddress;
+                var local = new PriorityQueue<int, float>(topK + 1, WorstFirst);
+                var end = Math.Min(count, (p + 1) * partitionSize);
+
+                for (var row = p * partitionSize; row < end; row++)
+                {
+                    if (row % CancellationCheckRows == 0 && ct.IsCancellationRequested) break;
+
+                    var vector = new ReadOnlySpan<float>(rows + (long)row * dimension, dimension);
+                    Offer(local, row, SquaredL2(query, vector), topK);
+                }
+
+                partial[p] = local;
+            });
+
+            ct.ThrowIfCancellationRequested();
+
+            foreach (var local in partial)
+            {
+                while (local.TryDequeue(out var row, out var distance)) Offer(heap, row, distance, topK);
+            }
+        }
+        finally
+        {
+            handle.ReleasePointer();
+        }
+    }
+
+    private static void Offer(PriorityQueue<int, float> heap, int row, float distance, int topK)
+    {
+        if (heap.Count < topK)
+            heap.Enqueue(row, distance);
+        else if (heap.TryPeek(out _, out var worst) && distance < worst)
+            heap.DequeueEnqueue(row, distance);
+    }
+
+    private static float SquaredL2(ReadOnlySpan<float> a, ReadOnlySpan<float> b)
+    {
+        var sum = Vector<float>.Zero;
+        var width = Vector<float>.Count;
+        var i = 0;
+
+        for (; i <= a.Length - width; i += width)
+        {
+            var diff = new Vector<float>(a.Slice(i)) - new Vector<float>(b.Slice(i));
+            sum += diff * diff;
+        }
+
+        var result = Vector.Sum(sum);
+        for (; i < a.Length; i++)
+        {
+            var diff = a[i] - b[i];
+            result += diff * diff;
+        }
+
+        return result;
+    }
+
+    private void Load()
+    {
+        var isCorrupted = false;
+        if (File.Exists(_metadataPath))
+        {
+            foreach (var line in File.ReadLines(_metadataPath))
+            {
+                if (string.IsNullOrWhiteSpace(line)) continue;
+                try
+                {
+                    var meta = JsonSerializer.Deserialize<VectorMetadata>(line);
+                    if (meta != null) _metadata.Add(meta);
+                }
+                catch (JsonException)
+                {
+                    _logger.LogWarning("Dropping corrupted metadata tail in {Path}", _metadataPath);
+                    isCorrupted = true;
+                    break;
+                }
+            }
+        }
+
+        if (File.Exists(_vectorsPath) && new FileInfo(_vectorsPath).Length >= HeaderSize)
+        {
+            using var reader = new BinaryReader(File.OpenRead(_vectorsPath));
+            _dimension = reader.ReadInt32();
+        }
+
+        if (_dimension <= 0)
+        {
+            // Missing file, torn header or garbage dimension: nothing in the vector file is usable.
+            _dimension = 0;
+            if (File.Exists(_vectorsPath)) File.Delete(_vectorsPath);
+            if (_metadata.Count > 0 || isCorrupted) TruncateTo(0);
+            return;
+        }
+
+        var rowSize = (long)_dimension * sizeof(float);
+        var length = new FileInfo(_vectorsPath).Length;
+        var vectorCount = (int)((length - HeaderSize) / rowSize);
+
+        // Vectors are written before metadata, so after a crash either log may hold a partial tail.
+        var consistentCount = Math.Min(vectorCount, _metadata.Count);
+        if (isCorrupted || consistentCount != _metadata.Count || length != HeaderSize + consistentCount * rowSize)
+        {
+            _logger.LogWarning("Knowledge base is inconsistent ({Length} bytes, {Vectors} vectors, {Metadata} metadata rows). Truncating to {Count}.", length, vectorCount, _metadata.Count, consistentCount);
+            TruncateTo(consistentCount);
+        }
+
+        _logger.LogInformation("Loaded knowledge base {Path} with {Count} vectors of dimension {Dimension} for {Model}", _vectorsPath, _metadata.Count, _dimension, _embeddingModel);
+    }
+
+    private void TruncateTo(int count)
+    {
+        _metadata.RemoveRange(count, _metadata.Count - count);
+        File.WriteAllLines(_metadataPath, _metadata.Select(m => JsonSerializer.Serialize(m)));
+
+        if (File.Exists(_vectorsPath) && _dimension > 0)
+        {
+            using var vectors = new FileStream(_vectorsPath, FileMode.Open, FileAccess.Write);
+            vectors.SetLength(HeaderSize + (long)count * _dimension * sizeof(float));
+        }
+    }
+
+    private void RollBack(FileStream vectors, long committedLength)
+    {
+        try
+        {
+            vectors.SetLength(committedLength);
+            File.WriteAllLines(_metadataPath, _metadata.Select(m => JsonSerializer.Serialize(m)));
+        }
+        catch (Exception ex)
+        {
+            // Load() repairs whatever is left on the next start.
+            _logger.LogError(ex, "Failed to roll back a partial knowledge base write.");
+        }
+    }
+
+    private void AdoptUnversionedStore(string storePath)
+    {
+        // Stores written before the per-model layout have no model suffix; they were built with the legacy model.
+        var vectorsPath = $"{storePath}.vec";
+        var metadataPath = $"{storePath}.meta.jsonl";
+        if (!File.Exists(vectorsPath) && !File.Exists(metadataPath)) return;
+
+        if (_embeddingModel != LegacyEmbeddingModel)
+        {
+            _logger.LogError("Found {Path} built with {Legacy}, but KnowledgeBase:EmbeddingModel is {Model}. It is left untouched and {NewPath} is used instead.", vectorsPath, LegacyEmbeddingModel, _embeddingModel, _vectorsPath);
+            return;
+        }
+        if (File.Exists(_vectorsPath) || File.Exists(_metadataPath)) return;
+
+        if (File.Exists(vectorsPath)) File.Move(vectorsPath, _vectorsPath);
+        if (File.Exists(metadataPath)) File.Move(metadataPath, _metadataPath);
+        _logger.LogInformation("Moved knowledge base {Path} to {NewPath}", vectorsPath, _vectorsPath);
+    }
+
+    private void MigrateLegacyStore()
+    {
+        if (!File.Exists(LegacyKnowledgeBasePath)) return;
+        if (_embeddingModel != LegacyEmbeddingModel)
+        {
+            _logger.LogError("Legacy knowledge base {Path} holds {Legacy} embeddings, but KnowledgeBase:EmbeddingModel is {Model}. Skipping migration.", LegacyKnowledgeBasePath, LegacyEmbeddingModel, _embeddingModel);
+            return;
+        }
+
+        try
+        {
+            var json = File.ReadAllText(LegacyKnowledgeBasePath);
+            var records = string.IsNullOrWhiteSpace(json)
+                ? new List<VectorRecord>()
+                : JsonSerializer.Deserialize<List<VectorRecord>>(json) ?? new List<VectorRecord>();
+
+            foreach (var session in records.Where(r => r.Embedding.Length > 0).GroupBy(r => r.SessionId))
+            {
+                Append(session.Key, session.Select(r => r.Text).ToList(), session.Select(r => r.Embedding).ToList());
+            }
+
+            File.Move(LegacyKnowledgeBasePath, $"{LegacyKnowledgeBasePath}.migrated", true);
+            _logger.LogInformation("Migrated {Count} records from {Path}", records.Count, LegacyKnowledgeBasePath);
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "Failed to migrate legacy knowledge base {Path}", LegacyKnowledgeBasePath);
+        }
+    }
+
+    private static string ToFileName(string model)
+    {
+        var invalid = Path.GetInvalidFileNameChars();
+        return string.Concat(model.Select(c => invalid.Contains(c) || c == ':' ? '_' : c));
+    }
+
+    private void ReleaseMap()
+    {
+        _map?.Dispose();
+        _map = null;
+        _mappedCount = 0;
+    }
+
+    public void Dispose()
+    {
+        _lock.EnterWriteLock();
+        try { ReleaseMap(); }
+        finally { _lock.ExitWriteLock(); }
+        _lock.Dispose();
+    }
+}
@@ -1,148 +1,316 @@
 ﻿using CopilotBackend.ApiService.Abstractions;
 using CopilotBackend.ApiService.Configuration;
-using CopilotBackend.ApiService.Services.Ai.Providers;
-using FaissMask;
+using CopilotBackend.ApiService.Services.Ai;
 using Microsoft.Extensions.Options;
+using System.Diagnostics;
+using System.Diagnostics.Metrics;
 using System.Text;
 using System.Text.Json;
-using System.Text.Json.Nodes;
+using System.Threading.Channels;
 
 namespace CopilotBackend.ApiService.Services;
 
-public class VectorRecord
-{
-    public string SessionId { get; set; } = string.Empty;
-    public string Text { get; set; } = string.Empty;
-    public float[] Embedding { get; set; } = Array.Empty<float>();
-}
+public record SummarizationStats(int PendingSessions, int PendingEmbeddings, long ProcessedSessions, long FailedSessions, long SpilledSessions);
 
-public class SummarizationFaissWorker
+/// <summary>
+/// Background queue for finished sessions. Summarization runs on a fixed number of workers,
+/// embeddings are requested in batches across sessions and a single writer appends to the vector store.
+/// Sessions that cannot be finished before shutdown are spilled to disk and picked up on the next start.
+/// </summary>
+public class SummarizationFaissWorker : BackgroundService
 {
     private readonly IEnumerable<ILlmProvider> _providers;
     private readonly ILogger<SummarizationFaissWorker> _logger;
-    private readonly IOpenAiApi _openAiApi;
-    private readonly AiOptions _aiOptions;
+    private readonly EmbeddingService _embeddingService;
+    private readonly SessionVectorStore _vectorStore;
+    private readonly SummarizationOptions _options;
+    private readonly object _spillLock = new();
+
+    private readonly Channel<PendingSession> _sessions;
+    private readonly Channel<SummarizedSession> _summaries;
 
-    private readonly string _knowledgeBasePath = "knowledge_base.json";
+    private readonly Histogram<double> _summarizationDuration;
+    private readonly Histogram<double> _embeddingDuration;
+    private readonly Histogram<int> _embeddingBatchSize;
+    private long _processedSessions;
+    private long _failedSessions;
+    private long _spilledSessions;
+    private volatile bool _isStopping;
 
     public SummarizationFaissWorker(
         IEnumerable<ILlmProvider> providers,
         ILogger<SummarizationFaissWorker> logger,
-        IOpenAiApi openAiApi,
-        IOptions<AiOptions> aiOptions)
+        EmbeddingService embeddingService,
+        SessionVectorStore vectorStore,
+        IOptions<SummarizationOptions> options,
+        IMeterFactory meterFactory)
     {
         _providers = providers;
         _logger = logger;
-        _openAiApi = openAiApi;
-        _aiOptions = aiOptions.Value;
+        _embeddingService = embeddingService;
+        _vectorStore = vectorStore;
+        _options = options.Value;
+
+        // Unbounded on purpose: a finished session is small next to the cost of losing it from the knowledge base.
+        _sessions = Channel.CreateUnbounded<PendingSession>();
+        _summaries = Channel.CreateUnbounded<SummarizedSession>(new UnboundedChannelOptions { SingleReader = true });
+
+        var meter = meterFactory.Create("CopilotBackend.Summarization");
+        meter.CreateObservableGauge("summarization.queue.sessions", () => _sessions.Reader.Count, description: "Sessions waiting for summarization");
+        meter.CreateObservableGauge("summarization.queue.embeddings", () => _summaries.Reader.Count, description: "Summarized sessions waiting for embeddings");
+        meter.CreateObservableCounter("summarization.sessions.processed", () => Interlocked.Read(ref _processedSessions));
+        meter.CreateObservableCounter("summarization.sessions.failed", () => Interlocked.Read(ref _failedSessions));
+        meter.CreateObservableCounter("summarization.sessions.spilled", () => Interlocked.Read(ref _spilledSessions));
+        _summarizationDuration = meter.CreateHistogram<double>("summarization.duration", "ms", "LLM summarization time per session");
+        _embeddingDuration = meter.CreateHistogram<double>("summarization.embedding.duration", "ms", "Embedding and store time per batch");
+        _embeddingBatchSize = meter.CreateHistogram<int>("summarization.embedding.batch_size", "{block}", "Blocks per embedding request");
     }
 
-    public async Task ProcessSessionAsync(string sessionId, List<ConversationMessage> history)
+    public SummarizationStats GetStats() => new(
+        _sessions.Reader.Count,
+        _summaries.Reader.Count,
+        Interlocked.Read(ref _processedSessions),
+        Interlocked.Read(ref _failedSessions),
+        Interlocked.Read(ref _spilledSessions));
+
+    /// <summary>
+    /// Queues a finished session without blocking. Once shutdown has started the session is spilled to disk instead.
+    /// </summary>
+    public void Enqueue(string sessionId, List<ConversationMessage> history)
     {
-        try
-        {
-            _logger.LogInformation("Starting background summarization for session: {SessionId}", sessionId);
+        var session = new PendingSession(sessionId, history);
+        if (_sessions.Writer.TryWrite(session)) return;
 
-            var fullTranscript = new StringBuilder();
-            foreach (var msg in history)
-            {
-                fullTranscript.AppendLine($"{msg.Role}: {msg.Text}");
-            }
+        _logger.LogInformation("Summarization queue is shutting down. Spilling session {SessionId} to {Path}.", sessionId, _options.SpillPath);
+        Spill([session]);
+    }
 
-            var provider = _providers.FirstOrDefault(p => p.ProviderName == "OpenAI");
+    protected override Task ExecuteAsync(CancellationToken stoppingToken)
+    {
+        RestoreSpilledSessions();
 
-            if (provider == null)
-                return;
+        var workers = Enumerable.Range(0, Math.Max(1, _options.WorkerCount))
+            .Select(_ => Task.Run(() => SummarizeLoopAsync(stoppingToken), CancellationToken.None))
+            .ToArray();
 
-            var prompt = new List<ChatMessage>
-            {
-                new ChatMessage(ChatRole.System, "You are a data structurer. Analyze the conversation. Break it down into logical topics/blocks. Separate each block exactly with the delimiter '###BLOCK###'."),
-                new ChatMessage(ChatRole.User, fullTranscript.ToString())
-            };
+        var writer = Task.Run(() => EmbeddingLoopAsync(stoppingToken), CancellationToken.None);
 
-            var summaryResult = await provider.GenerateResponseAsync(prompt, "gpt-4o-mini");
+        return Task.WhenAll(Task.WhenAll(workers).ContinueWith(_ => _summaries.Writer.TryComplete(), TaskScheduler.Default), writer);
+    }
 
-            var semanticBlocks = summaryResult
-                .Split("###BLOCK###", StringSplitOptions.RemoveEmptyEntries)
-                .Select(b => b.Trim())
-                .Where(b => !string.IsNullOrEmpty(b))
-                .ToList();
+    public override async Task StopAsync(CancellationToken cancellationToken)
+    {
+        // Stop accepting sessions and let the queue drain until the host shutdown timeout fires.
+        _isStopping = true;
+        _sessions.Writer.TryComplete();
 
-            if (semanticBlocks.Any())
-            {
-                await SaveToFaissLocalAsync(sessionId, semanticBlocks);
-            }
+        if (ExecuteTask != null)
+        {
+            await Task.WhenAny(ExecuteTask, Task.Delay(Timeout.Infinite, cancellationToken));
         }
-        catch (Exception ex)
+
+        await base.StopAsync(cancellationToken);
+
+        // Whatever the loops did not pick up before the shutdown timeout goes to disk for the next start.
+        var leftovers = new List<PendingSession>();
+        while (_sessions.Reader.TryRead(out var session)) leftovers.Add(session);
+        while (_summaries.Reader.TryRead(out var summary)) leftovers.Add(summary.ToPending());
+        if (leftovers.Count > 0) Spill(leftovers);
+    }
+
+    private async Task SummarizeLoopAsync(CancellationToken ct)
+    {
+        await foreach (var session in _sessions.Reader.ReadAllAsync(ct))
         {
-            _logger.LogError(ex, "Error during Summarization Worker processing.");
+            var started = Stopwatch.GetTimestamp();
+            try
+            {
+                _logger.LogInformation("Starting background summarization for session: {SessionId}", session.SessionId);
+
+                var blocks = await WithRetryAsync(() => SummarizeAsync(session.History, ct), "summarization", session.SessionId, ct);
+                if (blocks.Any())
+                {
+                    await _summaries.Writer.WriteAsync(new SummarizedSession(session.SessionId, session.History, blocks), ct);
+                }
+                else
+                {
+                    Interlocked.Increment(ref _processedSessions);
+                }
+            }
+            catch (OperationCanceledException) when (ct.IsCancellationRequested)
+            {
+                Spill([session]);
+                break;
+            }
+            catch (Exception ex)
+            {
+                Interlocked.Increment(ref _failedSessions);
+                _logger.LogError(ex, "Error during Summarization Worker processing for session {SessionId}.", session.SessionId);
+            }
+            finally
+            {
+                _summarizationDuration.Record(Stopwatch.GetElapsedTime(started).TotalMilliseconds);
+            }
         }
     }
 
-    private async Task SaveToFaissLocalAsync(string sessionId, List<string> blocks)
+    private async Task EmbeddingLoopAsync(CancellationToken ct)
     {
-        var embeddings = await GetEmbeddingsAsync(blocks);
-        if (!embeddings.Any()) return;
+        var batchLimit = Math.Max(1, _options.EmbeddingBatchSize);
+        var batch = new List<SummarizedSession>();
 
-        var records = new List<VectorRecord>();
-        if (File.Exists(_knowledgeBasePath))
+        while (await _summaries.Reader.WaitToReadAsync(ct))
         {
-            var json = await File.ReadAllTextAsync(_knowledgeBasePath);
-            if (!string.IsNullOrWhiteSpace(json))
+            var blockCount = 0;
+            while (blockCount < batchLimit && _summaries.Reader.TryRead(out var summary))
+            {
+                batch.Add(summary);
+                blockCount += summary.Blocks.Count;
+            }
+
+            var started = Stopwatch.GetTimestamp();
+            try
             {
-                records = JsonSerializer.Deserialize<List<VectorRecord>>(json) ?? new List<VectorRecord>();
+                await SaveToKnowledgeBaseAsync(batch, batchLimit, ct);
+                Interlocked.Add(ref _processedSessions, batch.Count);
+            }
+            catch (OperationCanceledException) when (ct.IsCancellationRequested)
+            {
+                Spill(batch.Select(s => s.ToPending()).ToList());
+                break;
+            }
+            catch (Exception ex)
+            {
+                Interlocked.Add(ref _failedSessions, batch.Count);
+                _logger.LogError(ex, "Failed to store embeddings for {Count} sessions.", batch.Count);
+            }
+            finally
+            {
+                _embeddingBatchSize.Record(blockCount);
+                _embeddingDuration.Record(Stopwatch.GetElapsedTime(started).TotalMilliseconds);
+                batch.Clear();
             }
         }
+    }
 
-        for (int i = 0; i < blocks.Count; i++)
+    private async Task<List<string>> SummarizeAsync(List<ConversationMessage> history, CancellationToken ct)
+    {
+        var fullTranscript = new StringBuilder();
+        foreach (var msg in history)
         {
-            records.Add(new VectorRecord
-            {
-                SessionId = sessionId,
-                Text = blocks[i],
-                Embedding = embeddings[i]
-            });
+            fullTranscript.AppendLine($"{msg.Role}: {msg.Text}");
         }
 
-        var options = new JsonSerializerOptions { WriteIndented = true };
-        await File.WriteAllTextAsync(_knowledgeBasePath, JsonSerializer.Serialize(records, options));
+        var provider = _providers.FirstOrDefault(p => p.ProviderName == "OpenAI");
+
+        if (provider == null)
+            return new List<string>();
 
-        var dimension = embeddings.First().Length;
+        var prompt = new List<ChatMessage>
+        {
+            new ChatMessage(ChatRole.System, "You are a data structurer. Analyze the conversation. Break it down into logical topics/blocks. Separate each block exactly with the delimiter '###BLOCK###'."),
+            new ChatMessage(ChatRole.User, fullTranscript.ToString())
+        };
+
+        var summaryResult = await provider.GenerateResponseAsync(prompt, _options.Model, ct: ct);
+
+        return summaryResult
+            .Split("###BLOCK###", StringSplitOptions.RemoveEmptyEntries)
+            .Select(b => b.Trim())
+            .Where(b => !string.IsNullOrEmpty(b))
+            .ToList();
+    }
 
-        List<float[]> allVectors = records.Select(r => r.Embedding).ToList();
+    private async Task SaveToKnowledgeBaseAsync(List<SummarizedSession> batch, int batchLimit, CancellationToken ct)
+    {
+        var texts = batch.SelectMany(s => s.Blocks).ToList();
+        var embeddings = new List<float[]>(texts.Count);
 
-        using (var index = new IndexFlatL2(dimension))
+        // A single oversized session can still exceed the limit, so split the request accordingly.
+        foreach (var chunk in texts.Chunk(batchLimit))
         {
-            index.Add(allVectors);
-            _logger.LogInformation("Elements in memory index: {Count}", index.Count);
+            var result = await WithRetryAsync(() => _embeddingService.GetEmbeddingsAsync(chunk, ct), "embedding", $"{batch.Count} sessions", ct);
+            embeddings.AddRange(result);
         }
 
-        _logger.LogInformation("Successfully saved {Count} new vectors. Total vectors in base: {Total}", blocks.Count, records.Count);
+        if (embeddings.Count != texts.Count)
+            throw new InvalidOperationException($"Embedding count mismatch: {embeddings.Count} of {texts.Count}.");
+
+        var offset = 0;
+        foreach (var session in batch)
+        {
+            _vectorStore.Append(session.SessionId, session.Blocks, embeddings.GetRange(offset, session.Blocks.Count));
+            offset += session.Blocks.Count;
+        }
     }
 
-    private async Task<List<float[]>> GetEmbeddingsAsync(List<string> texts)
+    private void Spill(IReadOnlyList<PendingSession> sessions)
     {
-        var request = new JsonObject
+        try
         {
-            ["model"] = "text-embedding-3-small",
-            ["input"] = new JsonArray(texts.Select(t => (JsonNode)t).ToArray())
-        };
+            lock (_spillLock)
+            {
+                File.AppendAllLines(_options.SpillPath, sessions.Select(s => JsonSerializer.Serialize(s)));
+            }
+            Interlocked.Add(ref _spilledSessions, sessions.Count);
+            _logger.LogInformation("Spilled {Count} pending sessions to {Path}.", sessions.Count, _options.SpillPath);
+        }
+        catch (Exception ex)
+        {
+            Interlocked.Add(ref _failedSessions, sessions.Count);
+            _logger.LogError(ex, "Failed to spill {Count} pending sessions to {Path}.", sessions.Count, _options.SpillPath);
+        }
+    }
 
-        var response = await _openAiApi.GetEmbeddingsAsync(request, $"Bearer {_aiOptions.OpenAiApiKey}");
-        var dataArray = response["data"]?.AsArray();
+    private void RestoreSpilledSessions()
+    {
+        List<string> lines;
+        lock (_spillLock)
+        {
+            if (!File.Exists(_options.SpillPath)) return;
+            lines = File.ReadAllLines(_options.SpillPath).ToList();
+            File.Delete(_options.SpillPath);
+        }
 
-        var result = new List<float[]>();
-        if (dataArray == null) return result;
+        var restored = 0;
+        foreach (var line in lines.Where(l => !string.IsNullOrWhiteSpace(l)))
+        {
+            try
+            {
+                var session = JsonSerializer.Deserialize<PendingSession>(line);
+                if (session != null && _sessions.Writer.TryWrite(session)) restored++;
+            }
+            catch (JsonException)
+            {
+                // A torn last line from a crash mid-write; the rest of the file is still usable.
+                _logger.LogWarning("Skipping corrupted line in {Path}.", _options.SpillPath);
+            }
+        }
 
-        foreach (var item in dataArray)
+        _logger.LogInformation("Restored {Count} spilled sessions from {Path}.", restored, _options.SpillPath);
+    }
+
+    private async Task<T> WithRetryAsync<T>(Func<Task<T>> action, string operation, string target, CancellationToken ct)
+    {
+        var maxAttempts = Math.Max(1, _options.MaxAttempts);
+        for (var attempt = 1; ; attempt++)
         {
-            var embedding = item?["embedding"]?.AsArray().Select(v => (float)v!.GetValue<double>()).ToArray();
-            if (embedding != null)
+            try
             {
-                result.Add(embedding);
+                return await action();
+            }
+            catch (Exception ex) when (attempt < maxAttempts && !ct.IsCancellationRequested)
+            {
+                var delay = TimeSpan.FromSeconds(Math.Pow(2, attempt));
+                _logger.LogWarning(ex, "Attempt {Attempt}/{MaxAttempts} of {Operation} for {Target} failed. Retrying in {Delay}.", attempt, maxAttempts, operation, target, delay);
+                await Task.Delay(delay, ct);
             }
         }
+    }
 
-        return result;
+    private record PendingSession(string SessionId, List<ConversationMessage> History);
+    private record SummarizedSession(string SessionId, List<ConversationMessage> History, List<string> Blocks)
+    {
+        public PendingSession ToPending() => new(SessionId, History);
     }
 }
\ No newline at end of file
@@ -0,0 +1,23 @@
+﻿namespace CopilotBackend.Benchmarks;
+
+public static class Program
+{
+    public static async Task<int> Main(string[] args)
+    {
+        var name = args.FirstOrDefault() ?? "stream";
+        switch (name)
+        {
+            case "stream":
+                await StreamCoalescingBenchmark.RunAsync(args.Skip(1).ToArray());
+                return 0;
+            case "vectors":
+                VectorStoreBenchmark.Run(args.Skip(1).ToArray());
+                return 0;
+            case "questions":
+                return QuestionPreFilterEvaluation.Run(args.Skip(1).ToArray());
+            default:
+                Console.WriteLine($"Unknown benchmark '{name}'. Available: stream, vectors, questions");
+                return 1;
+        }
+    }
+}
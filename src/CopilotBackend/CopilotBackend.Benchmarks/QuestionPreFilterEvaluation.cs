@@ -0,0 +1,54 @@
+﻿using CopilotBackend.ApiService.Configuration;
+using CopilotBackend.ApiService.Services.Ai;
+using Microsoft.Extensions.Options;
+using System.Text.Json;
+
+namespace CopilotBackend.Benchmarks;
+
+/// <summary>
+/// Scores QuestionPreFilter against the labelled Smart Mode utterances in Data/smart_mode_transcripts.jsonl.
+/// Only the "holdout" split is scored; the "tune" split is what the word lists were adjusted against.
+/// One utterance maps to at most one LLM detector call, so rejected utterances are LLM calls saved.
+/// </summary>
+public static class QuestionPreFilterEvaluation
+{
+    private record LabelledUtterance(string Transcript, string Split, string Text, bool Question);
+
+    public static int Run(string[] args)
+    {
+        var path = args.Length > 0 ? args[0] : Path.Combine(AppContext.BaseDirectory, "Data", "smart_mode_transcripts.jsonl");
+        var split = args.Length > 1 ? args[1] : "holdout";
+        var jsonOptions = new JsonSerializerOptions { PropertyNameCaseInsensitive = true };
+        var samples = File.ReadLines(path)
+            .Where(l => !string.IsNullOrWhiteSpace(l))
+            .Select(l => JsonSerializer.Deserialize<LabelledUtterance>(l, jsonOptions)!)
+            .Where(s => s.Split == split)
+            .ToList();
+
+        var options = new SmartModeOptions();
+        var filter = new QuestionPreFilter(Options.Create(options));
+        int tp = 0, fp = 0, fn = 0, tn = 0;
+
+        foreach (var sample in samples)
+        {
+            var predicted = filter.IsLikelyQuestion(sample.Text);
+            switch (predicted, sample.Question)
+            {
+                case (true, true): tp++; break;
+                case (true, false): fp++; Console.WriteLine($"false positive [{sample.Transcript}]: {sample.Text}"); break;
+                case (false, true): fn++; Console.WriteLine($"false negative [{sample.Transcript}]: {sample.Text}"); break;
+                default: tn++; break;
+            }
+        }
+
+        var precision = tp + fp == 0 ? 0 : (double)tp / (tp + fp);
+        var recall = tp + fn == 0 ? 0 : (double)tp / (tp + fn);
+        var skipped = fn + tn;
+
+        Console.WriteLine($"Split: {split}, long utterance pass-through at {options.LongUtteranceWords} words");
+        Console.WriteLine($"Utterances: {samples.Count} ({tp + fn} questions)");
+        Console.WriteLine($"Precision: {precision:P1}  Recall: {recall:P1}");
+        Console.WriteLine($"LLM detector calls: {tp + fp} of {samples.Count} utterances, {skipped} skipped ({(double)skipped / samples.Count:P0})");
+        return 0;
+    }
+}
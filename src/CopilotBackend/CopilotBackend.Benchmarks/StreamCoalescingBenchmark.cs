@@ -0,0 +1,108 @@
+﻿using CopilotBackend.ApiService.Extensions;
+using System.Diagnostics;
+using System.Runtime.CompilerServices;
+using System.Text;
+using System.Text.Json;
+
+namespace CopilotBackend.Benchmarks;
+
+/// <summary>
+/// Replays a synthetic stream of 1-2 char deltas and compares raw hub items with coalesced ones.
+/// Every item is framed the way SignalR's JSON protocol sends a StreamItem, so the CPU figure covers serialization.
+/// Both item sequences are written to a JSON file that client_render_benchmark.py replays for client CPU.
+/// </summary>
+public static class StreamCoalescingBenchmark
+{
+    private const char RecordSeparator = '\u001e';
+
+    public static async Task RunAsync(string[] args)
+    {
+        var deltaCount = args.Length > 0 ? int.Parse(args[0]) : 4000;
+        var deltasPerSecond = args.Length > 1 ? int.Parse(args[1]) : 400;
+        var maxChars = args.Length > 2 ? int.Parse(args[2]) : 64;
+        var maxDelayMs = args.Length > 3 ? int.Parse(args[3]) : 30;
+        var outputPath = args.Length > 4 ? args[4] : "stream_chunks.json";
+
+        var deltas = BuildDeltas(deltaCount);
+        Console.WriteLine($"Deltas: {deltas.Count}, rate: {deltasPerSecond}/s, threshold: {maxChars} chars / {maxDelayMs} ms");
+
+        var raw = await RunCaseAsync("raw", deltas, deltasPerSecond, s => s);
+        var coalesced = await RunCaseAsync("coalesced", deltas, deltasPerSecond, s => s.CoalesceAsync(maxChars, TimeSpan.FromMilliseconds(maxDelayMs)));
+
+        await File.WriteAllTextAsync(outputPath, JsonSerializer.Serialize(new { raw, coalesced }));
+        Console.WriteLine($"Item sequences written to {Path.GetFullPath(outputPath)}");
+    }
+
+    private static async Task<List<string>> RunCaseAsync(string name, List<string> deltas, int deltasPerSecond, Func<IAsyncEnumerable<string>, IAsyncEnumerable<string>> pipeline)
+    {
+        var process = Process.GetCurrentProcess();
+        var cpuBefore = process.TotalProcessorTime;
+        var started = Stopwatch.GetTimestamp();
+        TimeSpan? firstItem = null;
+        var messages = 0;
+        var bytes = 0L;
+        var text = new StringBuilder();
+        var items = new List<string>();
+
+        await foreach (var item in pipeline(ReplayAsync(deltas, deltasPerSecond)))
+        {
+            firstItem ??= Stopwatch.GetElapsedTime(started);
+            messages++;
+            bytes += Frame(item).Length;
+            text.Append(item);
+            items.Add(item);
+        }
+
+        var elapsed = Stopwatch.GetElapsedTime(started);
+        process.Refresh();
+        var cpu = process.TotalProcessorTime - cpuBefore;
+
+        if (text.ToString() != string.Concat(deltas))
+            throw new InvalidOperationException($"{name}: reassembled text does not match the source stream.");
+
+        Console.WriteLine(
+            $"{name,-10} messages: {messages,6}  msg/s: {messages / elapsed.TotalSeconds,8:F1}  bytes: {bytes,8}  " +
+            $"first item: {firstItem?.TotalMilliseconds ?? 0,6:F1} ms  total: {elapsed.TotalMilliseconds,8:F0} ms  cpu: {cpu.TotalMilliseconds,6:F0} ms");
+        return items;
+    }
+
+    private static string Frame(string item) =>
+        JsonSerializer.Serialize(new { type = 2, invocationId = "1", item }) + RecordSeparator;
+
+    private static async IAsyncEnumerable<string> ReplayAsync(List<string> deltas, int deltasPerSecond, [EnumeratorCancellation] CancellationToken ct = default)
+    {
+        var interval = TimeSpan.FromSeconds(1.0 / Math.Max(1, deltasPerSecond));
+        var started = Stopwatch.GetTimestamp();
+
+        for (var i = 0; i < deltas.Count; i++)
+        {
+            // Sleep in coarse steps so the replay keeps the requested average rate despite timer resolution.
+            var due = interval * i;
+            var ahead = due - Stopwatch.GetElapsedTime(started);
+            if (ahead > TimeSpan.FromMilliseconds(5)) await Task.Delay(ahead, ct);
+
+            yield return deltas[i];
+        }
+    }
+
+    private static List<string> BuildDeltas(int count)
+    {
+        const string source = "Sure, here is how the cache invalidation works in this service. ";
+        var random = new Random(42);
+        var deltas = new List<string>(count);
+        var position = 0;
+
+        while (deltas.Count < count)
+        {
+            var length = random.Next(1, 3);
+            var delta = new StringBuilder();
+            for (var i = 0; i < length; i++)
+            {
+                delta.Append(source[position++ % source.Length]);
+            }
+            deltas.Add(delta.ToString());
+        }
+
+        return deltas;
+    }
+}
@@ -0,0 +1,92 @@
+﻿using CopilotBackend.ApiService.Configuration;
+using CopilotBackend.ApiService.Services;
+using Microsoft.Extensions.Logging.Abstractions;
+using Microsoft.Extensions.Options;
+using System.Diagnostics;
+
+namespace CopilotBackend.Benchmarks;
+
+/// <summary>
+/// Fills a temporary SessionVectorStore with random unit vectors and times appends and top-k searches
+/// against the configured search budget.
+/// </summary>
+public static class VectorStoreBenchmark
+{
+    public static void Run(string[] args)
+    {
+        var vectorCount = args.Length > 0 ? int.Parse(args[0]) : 100_000;
+        var dimension = args.Length > 1 ? int.Parse(args[1]) : 1536;
+        var queries = args.Length > 2 ? int.Parse(args[2]) : 20;
+        var defaults = new KnowledgeBaseOptions();
+        var searchBudgetMs = args.Length > 3 ? int.Parse(args[3]) : defaults.SearchTimeoutMs;
+        var topK = defaults.TopK;
+        const int batchSize = 1000;
+
+        var directory = Path.Combine(Path.GetTempPath(), $"kb-bench-{Guid.NewGuid():N}");
+        Directory.CreateDirectory(directory);
+        var random = new Random(42);
+
+        try
+        {
+            var options = Options.Create(new KnowledgeBaseOptions { StorePath = Path.Combine(directory, "knowledge_base") });
+
+            using (var store = new SessionVectorStore(NullLogger<SessionVectorStore>.Instance, options))
+            {
+                var started = Stopwatch.GetTimestamp();
+                for (var offset = 0; offset < vectorCount; offset += batchSize)
+                {
+                    var size = Math.Min(batchSize, vectorCount - offset);
+                    var texts = Enumerable.Range(offset, size).Select(i => $"block {i}").ToList();
+                    var embeddings = Enumerable.Range(0, size).Select(_ => RandomUnitVector(random, dimension)).ToList();
+                    store.Append($"session-{offset / batchSize}", texts, embeddings);
+                }
+                var appendMs = Stopwatch.GetElapsedTime(started).TotalMilliseconds;
+                var fileMb = new FileInfo(Directory.GetFiles(directory, "*.vec").Single()).Length / (1024.0 * 1024.0);
+                Console.WriteLine($"Appended {vectorCount} x {dimension} in {appendMs:F0} ms ({fileMb:F0} MB on disk)");
+
+                started = Stopwatch.GetTimestamp();
+                store.Search(RandomUnitVector(random, dimension), topK);
+                Console.WriteLine($"First search (maps the file): {Stopwatch.GetElapsedTime(started).TotalMilliseconds:F1} ms");
+
+                var timings = new List<double>(queries);
+                for (var i = 0; i < queries; i++)
+                {
+                    started = Stopwatch.GetTimestamp();
+                    store.Search(RandomUnitVector(random, dimension), topK);
+                    timings.Add(Stopwatch.GetElapsedTime(started).TotalMilliseconds);
+                }
+                timings.Sort();
+                var p50 = timings[timings.Count / 2];
+                var p95 = timings[(int)(timings.Count * 0.95)];
+                var withinBudget = timings.Count(t => t <= searchBudgetMs);
+                Console.WriteLine($"Search top-{topK} over {queries} queries: p50 {p50:F1} ms, p95 {p95:F1} ms, max {timings[^1]:F1} ms");
+                Console.WriteLine($"Search budget {searchBudgetMs} ms (KnowledgeBase:SearchTimeoutMs): {withinBudget}/{queries} within budget, p95 {(p95 <= searchBudgetMs ? "PASS" : "FAIL")}");
+            }
+
+            var reloadStarted = Stopwatch.GetTimestamp();
+            using (var reloaded = new SessionVectorStore(NullLogger<SessionVectorStore>.Instance, Options.Create(new KnowledgeBaseOptions { StorePath = Path.Combine(directory, "knowledge_base") })))
+            {
+                Console.WriteLine($"Reloaded {reloaded.Count} vectors in {Stopwatch.GetElapsedTime(reloadStarted).TotalMilliseconds:F0} ms");
+            }
+        }
+        finally
+        {
+            Directory.Delete(directory, true);
+        }
+    }
+
+    private static float[] RandomUnitVector(Random random, int dimension)
+    {
+        var vector = new float[dimension];
+        var norm = 0.0;
+        for (var i = 0; i < dimension; i++)
+        {
+            vector[i] = (float)(random.NextDouble() * 2 - 1);
+            norm += vector[i] * vector[i];
+        }
+
+        var scale = (float)(1 / Math.Sqrt(norm));
+        for (var i = 0; i < dimension; i++) vector[i] *= scale;
+        return vector;
+    }
+}
@@ -0,0 +1,53 @@
+"""Client-side cost of rendering a streamed answer, raw deltas vs. server-coalesced chunks.
+
+Replays the item sequences written by the `stream` benchmark (the exact output of CoalesceAsync,
+including its time-based flushes) through the ChatWindow.on_llm_chunk rendering path
+(append, set_markdown, sizeHint, scrollToBottom) and reports messages and process CPU time.
+
+    dotnet run -c Release -- stream [deltas] [deltasPerSecond] [maxChunkChars] [maxChunkDelayMs] [stream_chunks.json]
+    python client_render_benchmark.py [stream_chunks.json]
+"""
+import os
+import sys
+import json
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "ui"))
+
+from PyQt6.QtWidgets import QApplication, QListWidget, QListWidgetItem
+from widgets import ChatMessage
+
+
+def render(chunks):
+    chat_list = QListWidget()
+    chat_list.resize(700, 600)
+    widget = ChatMessage("", False, max_width=680)
+    item = QListWidgetItem()
+    chat_list.addItem(item)
+    chat_list.setItemWidget(item, widget)
+
+    text = ""
+    started = time.process_time()
+    for chunk in chunks:
+        text += chunk
+        widget.set_markdown(text)
+        item.setSizeHint(widget.sizeHint())
+        chat_list.scrollToBottom()
+    return time.process_time() - started
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "stream_chunks.json"
+    with open(path, encoding="utf-8") as f:
+        sequences = json.load(f)
+
+    app = QApplication(sys.argv)
+    for name in ("raw", "coalesced"):
+        chunks = sequences[name]
+        cpu = render(chunks)
+        print(f"{name:<10} messages: {len(chunks):6}  client cpu: {cpu * 1000:8.0f} ms  per message: {cpu * 1e6 / len(chunks):8.0f} us")
+
+
+if __name__ == "__main__":
+    main()
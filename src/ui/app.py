@@ -1,4 +1,5 @@
 import sys
+import time
 import keyboard
 import io
 import base64
@@ -11,9 +12,10 @@ from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QTime
 from PyQt6.QtGui import QFont, QColor
 
 from constants import UI_TEXTS, MODELS, SetWindowDisplayAffinity, WDA_EXCLUDEFROMCAPTURE
-from widgets import ChatMessage, ChatInput
+from widgets import ChatMessage, ChatInput, DiagnosticsPanel
 from threads import SignalRWorker, TypingIndicator
 from constants import COLORS
+from diagnostics import ProfileCapture, process_memory, thread_count
 
 class ChatWindow(QMainWindow):
     toggle_signal = pyqtSignal()
@@ -29,6 +31,7 @@ class ChatWindow(QMainWindow):
         self.typing_item = None
         self.current_stream_msg_widget = None
         self.current_stream_text = ""
+        self.profile_capture = ProfileCapture()
 
         self.setWindowTitle(self.texts['title'])
         self.resize(1000, 750)
@@ -199,10 +202,18 @@ class ChatWindow(QMainWindow):
         self.screenshot_check = QCheckBox("Screenshots")
         self.screenshot_check.stateChanged.connect(self._update_screenshot_status)
         self.smart_mode_check = QCheckBox("Smart Mode")        
+        self.diagnostics_check = QCheckBox("Diagnostics")
+        self.diagnostics_check.stateChanged.connect(self._toggle_diagnostics)
+
+        self.diagnostics_panel = DiagnosticsPanel()
+        self.diagnostics_panel.setVisible(False)
+        self.diagnostics_panel.capture_clicked.connect(self._toggle_profile_capture)
 
         sidebar_layout.addWidget(side_title)
         sidebar_layout.addWidget(self.screenshot_check)
         sidebar_layout.addWidget(self.smart_mode_check)
+        sidebar_layout.addWidget(self.diagnostics_check)
+        sidebar_layout.addWidget(self.diagnostics_panel)
         sidebar_layout.addStretch()
 
         content_area.addLayout(chat_container, 1)
@@ -213,6 +224,9 @@ class ChatWindow(QMainWindow):
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_timer)
         self.elapsed = QTime(0, 0, 0)
+
+        self.diagnostics_timer = QTimer()
+        self.diagnostics_timer.timeout.connect(self._refresh_diagnostics)
         
     def create_action_btn(self, p_type, color_hex, badge):
         text = self.texts[f'{p_type}_btn']
@@ -444,6 +458,47 @@ class ChatWindow(QMainWindow):
         if self.signalr_worker:
             self.signalr_worker.screenshots_enabled = self.screenshot_check.isChecked()
 
+    def _toggle_diagnostics(self):
+        enabled = self.diagnostics_check.isChecked()
+        self.diagnostics_panel.setVisible(enabled)
+        if enabled:
+            self._refresh_diagnostics()
+            self.diagnostics_timer.start(1000)
+        else:
+            self.diagnostics_timer.stop()
+
+    def _refresh_diagnostics(self):
+        memory_label, memory = process_memory()
+        worker = self.signalr_worker
+        screenshot = "off"
+        if worker and worker.screenshots_enabled:
+            if worker.last_screenshot_at is None:
+                screenshot = "waiting"
+            else:
+                age = time.monotonic() - worker.last_screenshot_at
+                screenshot = f"{worker.last_screenshot_ms:.0f} ms, {age:.1f} s ago"
+
+        self.diagnostics_panel.update_stats({
+            memory_label: f"{memory:.1f} MB" if memory is not None else "n/a (install psutil)",
+            "Chat items": self.chat_list.count(),
+            "ChatMessage widgets": len(self.chat_list.findChildren(ChatMessage)),
+            "Typing threads": TypingIndicator.active_count,
+            "Python threads": thread_count(),
+            "Active streams": worker.active_streams if worker else 0,
+            "Screenshot loop": screenshot,
+        })
+
+    def _toggle_profile_capture(self):
+        if self.profile_capture.running:
+            try:
+                path = self.profile_capture.stop()
+                self.diagnostics_panel.set_capture_state(False, f"Saved {path}.prof")
+            except Exception as e:
+                self.diagnostics_panel.set_capture_state(False, f"Profile failed: {e}")
+        else:
+            self.profile_capture.start()
+            self.diagnostics_panel.set_capture_state(True, "Profiling...")
+
     def _set_window_affinity(self):
         if sys.platform == "win32" and SetWindowDisplayAffinity:
             SetWindowDisplayAffinity(self.winId().__int__(), WDA_EXCLUDEFROMCAPTURE)
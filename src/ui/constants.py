@@ -8,6 +8,10 @@ load_dotenv()
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:57875/api")
 HUB_URL = os.getenv("HUB_URL", "http://localhost:57875/hubs/smart")
 
+# Server-side batching of LLM deltas for this connection (see SmartHub.ConfigureStreaming).
+STREAM_MAX_CHUNK_CHARS = int(os.getenv("STREAM_MAX_CHUNK_CHARS", "64"))
+STREAM_MAX_CHUNK_DELAY_MS = int(os.getenv("STREAM_MAX_CHUNK_DELAY_MS", "30"))
+
 WDA_EXCLUDEFROMCAPTURE = 0x00000011
 SetWindowDisplayAffinity = None
 if sys.platform == "win32":
@@ -0,0 +1,63 @@
+import os
+import time
+import cProfile
+import threading
+import tracemalloc
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+TRACEMALLOC_TOP = 50
+
+
+def process_memory():
+    """Returns (label, megabytes) for the best memory figure available, or (label, None)."""
+    if psutil:
+        return "Process RSS", psutil.Process().memory_info().rss / (1024 * 1024)
+    if tracemalloc.is_tracing():
+        return "Python heap (traced)", tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+    return "Process memory", None
+
+
+def thread_count():
+    return threading.active_count()
+
+
+class ProfileCapture:
+    def __init__(self):
+        self.profiler = None
+        self.started_tracemalloc = False
+
+    @property
+    def running(self):
+        return self.profiler is not None
+
+    def start(self):
+        if self.running: return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self.started_tracemalloc = True
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        if not self.running: return None
+        self.profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, time.strftime("profile-%Y%m%d-%H%M%S"))
+
+        self.profiler.dump_stats(f"{base}.prof")
+        self.profiler = None
+
+        snapshot = tracemalloc.take_snapshot()
+        with open(f"{base}.tracemalloc.txt", "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
+
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        return base
@@ -1,4 +1,5 @@
 import io
+import time
 import base64
 import threading
 import numpy as np
@@ -6,7 +7,7 @@ import pyaudiowpatch as pyaudio
 from PIL import ImageGrab
 from PyQt6.QtCore import QThread, pyqtSignal
 from signalrcore.hub_connection_builder import HubConnectionBuilder
-from constants import HUB_URL
+from constants import HUB_URL, STREAM_MAX_CHUNK_CHARS, STREAM_MAX_CHUNK_DELAY_MS
 
 audio_init_lock = threading.Lock()
 
@@ -22,6 +23,11 @@ class SignalRWorker(QThread):
         self.is_running = True
         self.screenshots_enabled = False
         self._send_lock = threading.Lock()
+        self._streams_lock = threading.Lock()
+        self._stream_generation = 0
+        self.active_streams = 0
+        self.last_screenshot_ms = 0.0
+        self.last_screenshot_at = None
 
     def run(self):
         hub_url = HUB_URL.replace("http", "ws", 1) if HUB_URL.startswith("http") else HUB_URL
@@ -31,6 +37,7 @@ class SignalRWorker(QThread):
             .build()
 
         self.connection.on_open(self._on_open)
+        self.connection.on_reconnect(self._on_reconnect)
         self.connection.start()
 
         while self.is_running:
@@ -40,13 +47,20 @@ class SignalRWorker(QThread):
             self.connection.stop()
 
     def _on_open(self):
+        self.configure_streaming(STREAM_MAX_CHUNK_CHARS, STREAM_MAX_CHUNK_DELAY_MS)
         self.status_received.emit("System: Socket Connected")
         self.socket_ready.emit()
         threading.Thread(target=self.screenshot_context_loop, daemon=True).start()
 
+    def _on_reconnect(self):
+        # Streams from the dropped connection never complete, so stop counting them.
+        self._reset_streams()
+        self.status_received.emit("System: Socket Reconnecting")
+
     def screenshot_context_loop(self):
         while self.is_running:
             if self.connection and self.is_running and self.screenshots_enabled:
+                started = time.perf_counter()
                 try:
                     screenshot = ImageGrab.grab()
                     screenshot.thumbnail((1024, 1024))
@@ -58,8 +72,18 @@ class SignalRWorker(QThread):
                             self.connection.send("UpdateVisualContext", [img_str])
                 except:
                     pass
+                self.last_screenshot_ms = (time.perf_counter() - started) * 1000
+                self.last_screenshot_at = time.monotonic()
             threading.Event().wait(2.0)
 
+    def configure_streaming(self, max_chars, max_delay_ms):
+        if self.connection and self.is_running:
+            with self._send_lock:
+                try:
+                    self.connection.send("ConfigureStreaming", [max_chars, max_delay_ms])
+                except:
+                    pass
+
     def start_audio(self, lang):
         if self.connection and self.is_running: 
             with self._send_lock:
@@ -86,18 +110,40 @@ class SignalRWorker(QThread):
 
     def invoke_stream(self, method_name, args):
         if self.connection and self.is_running:
+            with self._streams_lock:
+                self.active_streams += 1
+                generation = self._stream_generation
             with self._send_lock:
                 try:
                     self.connection.stream(method_name, args).subscribe({
                         "next": lambda chunk: self.chunk_received.emit(str(chunk)),
-                        "complete": lambda _: self.chunk_received.emit("[DONE]"),
-                        "error": lambda e: self.status_received.emit(f"Stream Error: {e}")
+                        "complete": lambda _: self._on_stream_end(generation, "[DONE]"),
+                        "error": lambda e: self._on_stream_end(generation, f"Stream Error: {e}", is_error=True)
                     })
                 except:
-                    pass
+                    self._release_stream(generation)
+
+    def _release_stream(self, generation):
+        # Callbacks from before a reset belong to streams that were already written off.
+        with self._streams_lock:
+            if generation == self._stream_generation and self.active_streams > 0:
+                self.active_streams -= 1
+
+    def _reset_streams(self):
+        with self._streams_lock:
+            self._stream_generation += 1
+            self.active_streams = 0
+
+    def _on_stream_end(self, generation, message, is_error=False):
+        self._release_stream(generation)
+        if is_error:
+            self.status_received.emit(message)
+        else:
+            self.chunk_received.emit(message)
 
     def stop(self):
         self.is_running = False
+        self._reset_streams()
         if self.connection:
             try:
                 with self._send_lock:
@@ -110,14 +156,23 @@ class SignalRWorker(QThread):
 
 class TypingIndicator(QThread):
     update_signal = pyqtSignal(str)
+    active_count = 0
+    _count_lock = threading.Lock()
+
     def __init__(self):
         super().__init__()
         self.running = True
     def run(self):
-        dots = 1
-        while self.running:
-            self.update_signal.emit('.' * dots)
-            dots = (dots % 3) + 1
-            self.msleep(500)
+        with TypingIndicator._count_lock:
+            TypingIndicator.active_count += 1
+        try:
+            dots = 1
+            while self.running:
+                self.update_signal.emit('.' * dots)
+                dots = (dots % 3) + 1
+                self.msleep(500)
+        finally:
+            with TypingIndicator._count_lock:
+                TypingIndicator.active_count -= 1
     def stop(self):
         self.running = False
\ No newline at end of file
@@ -1,6 +1,6 @@
 import re
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, 
-                             QLabel, QFrame, QSizePolicy)
+                             QLabel, QFrame, QSizePolicy, QPushButton)
 from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPropertyAnimation, QEasingCurve
 from PyQt6.QtGui import QFont, QKeyEvent
 from constants import COLORS
@@ -92,6 +92,47 @@ class ChatMessage(QFrame):
         self.label.adjustSize()
         self.updateGeometry()
 
+class DiagnosticsPanel(QFrame):
+    capture_clicked = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 10, 0, 0)
+        layout.setSpacing(6)
+
+        self.stats_label = QLabel()
+        self.stats_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.stats_label.setStyleSheet(f"color: {COLORS['text_muted']}; font-family: 'JetBrains Mono'; font-size: 10px;")
+
+        self.capture_button = QPushButton("Start profile")
+        self.capture_button.setFixedHeight(26)
+        self.capture_button.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {COLORS['secondary']};
+                border: 1px solid {COLORS['border']};
+                border-radius: 4px;
+                font-size: 11px;
+            }}
+            QPushButton:hover {{ border: 1px solid {COLORS['primary']}; }}
+        """)
+        self.capture_button.clicked.connect(self.capture_clicked.emit)
+
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        self.status_label.setStyleSheet(f"color: {COLORS['text_muted']}; font-size: 10px;")
+
+        layout.addWidget(self.stats_label)
+        layout.addWidget(self.capture_button)
+        layout.addWidget(self.status_label)
+
+    def update_stats(self, stats: dict):
+        self.stats_label.setText("\n".join(f"{k}: {v}" for k, v in stats.items()))
+
+    def set_capture_state(self, running: bool, status: str = ""):
+        self.capture_button.setText("Stop && save profile" if running else "Start profile")
+        self.status_label.setText(status)
+
 class ChatInput(QTextEdit):
     send_signal = pyqtSignal()
 